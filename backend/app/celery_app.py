@@ -1,9 +1,61 @@
 from celery import Celery
+from celery.signals import worker_process_init
+import logging
 import os
+import shutil
+from typing import Any
+
+logger = logging.getLogger(__name__)
 
 redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
 
+
+def _nvidia_gpu_present() -> bool:
+    # torch.cuda.is_available() would initialise CUDA in the pre-fork parent and break CUDA in the
+    # worker processes, so only look for the driver tooling. This cannot tell whether torch itself
+    # was built with CUDA; set ASR_DEVICE explicitly on hosts where the two disagree.
+    return shutil.which("nvidia-smi") is not None
+
+
+def _default_worker_concurrency() -> int:
+    # One process per GPU avoids several workers loading Whisper/pyannote into the same VRAM.
+    device_preference = os.getenv("ASR_DEVICE", "auto").lower()
+    if device_preference == "cuda":
+        return 1
+    if device_preference == "cpu":
+        return 2
+    return 1 if _nvidia_gpu_present() else 2
+
+
+worker_concurrency = int(os.getenv("CELERY_WORKER_CONCURRENCY") or _default_worker_concurrency())
+# Export the resolved value so speech_pipeline can size CPU threads without importing Celery.
+os.environ["CELERY_WORKER_CONCURRENCY"] = str(worker_concurrency)
+
 celery_app = Celery("todo_maker", broker=redis_url, backend=redis_url)
 celery_app.conf.task_serializer = "json"
 celery_app.conf.result_serializer = "json"
 celery_app.conf.accept_content = ["json"]
+celery_app.conf.worker_concurrency = worker_concurrency
+celery_app.conf.worker_prefetch_multiplier = 1
+celery_app.conf.task_acks_late = True
+# With late acks, Redis redelivers any task still unacked after visibility_timeout; keep it above the longest job.
+celery_app.conf.broker_transport_options = {
+    "visibility_timeout": int(os.getenv("CELERY_VISIBILITY_TIMEOUT_SEC", "43200")),
+}
+celery_app.conf.worker_max_tasks_per_child = int(os.getenv("CELERY_WORKER_MAX_TASKS_PER_CHILD", "20"))
+celery_app.conf.task_routes = {"pipeline.run_pipeline": {"queue": "gpu"}}
+# Model loading runs in worker_process_init, so give new processes time to report in.
+celery_app.conf.worker_proc_alive_timeout = float(os.getenv("CELERY_WORKER_PROC_ALIVE_TIMEOUT", "300"))
+
+
+@worker_process_init.connect
+def _warm_up_models(**_: Any) -> None:
+    if os.getenv("ASR_WARMUP", "true").lower() not in {"1", "true", "yes", "on"}:
+        return
+    try:
+        from .speech_pipeline import warm_up_models
+
+        for skipped in warm_up_models():
+            logger.warning("Skipped model warmup: %s; it will be downloaded on the first job instead", skipped)
+    except Exception:
+        logger.exception("Model warmup failed; models will be loaded on the first job instead")
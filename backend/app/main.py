@@ -1,19 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import shutil
 import uuid
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator
 
+import orjson
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from .celery_app import celery_app
 
 app = FastAPI(title="todo-maker API", version="0.1.0")
 
+UPLOAD_CHUNK_SIZE = 1 << 20
+STATUS_WATCH_INTERVAL_SEC = 0.5
+STATUS_RESEND_INTERVAL_SEC = 15.0
+TERMINAL_STATUSES = {"completed", "failed"}
+
 
 def _job_dir(job_id: str) -> Path:
     root = Path(os.getenv("DATA_ROOT", "/data"))
@@ -37,8 +46,8 @@ async def upload_audio(file: UploadFile = File(...)) -> dict[str, str]:
 
     filename = file.filename or "input_audio"
     target = job_dir / filename
-    content = await file.read()
-    target.write_bytes(content)
+    with target.open("wb") as out:
+        await run_in_threadpool(shutil.copyfileobj, file.file, out, UPLOAD_CHUNK_SIZE)
 
     status = {
         "job_id": job_id,
@@ -58,7 +67,50 @@ def get_job_status(job_id: str) -> dict[str, Any]:
     status_file = _status_path(job_id)
     if not status_file.exists():
         raise HTTPException(status_code=404, detail="Job not found")
-    return json.loads(status_file.read_text(encoding="utf-8"))
+    return orjson.loads(status_file.read_bytes())
+
+
+async def _status_events(status_file: Path) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    last_mtime_ns: int | None = None
+    last_sent_at = 0.0
+
+    while True:
+        try:
+            mtime_ns = status_file.stat().st_mtime_ns
+        except OSError:
+            # The job directory was removed while the client was subscribed.
+            return
+        # Re-send the current status periodically so clients can enforce their own timeouts.
+        if mtime_ns != last_mtime_ns or loop.time() - last_sent_at >= STATUS_RESEND_INTERVAL_SEC:
+            try:
+                status = orjson.loads(status_file.read_bytes())
+            except OSError:
+                return
+            except orjson.JSONDecodeError:
+                # The worker is mid-write; pick it up on the next tick.
+                await asyncio.sleep(STATUS_WATCH_INTERVAL_SEC)
+                continue
+
+            last_mtime_ns = mtime_ns
+            last_sent_at = loop.time()
+            yield f"data: {orjson.dumps(status).decode('utf-8')}\n\n"
+            if status.get("status") in TERMINAL_STATUSES:
+                return
+
+        await asyncio.sleep(STATUS_WATCH_INTERVAL_SEC)
+
+
+@app.get("/jobs/{job_id}/events")
+def stream_job_events(job_id: str) -> StreamingResponse:
+    status_file = _status_path(job_id)
+    if not status_file.exists():
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        _status_events(status_file),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 @app.get("/jobs/{job_id}/result", response_class=PlainTextResponse)
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import functools
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+import numpy as np
+
+DEFAULT_ASR_MODEL = "distil-large-v3"
+DEFAULT_DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+TARGET_SAMPLE_RATE = 16000
 
 
 @dataclass
@@ -14,10 +21,6 @@ class PipelineRuntime:
     warnings: list[str]
 
 
-def _overlap(a_start: float, a_end: float, b_start: float, b_end: float) -> float:
-    return max(0.0, min(a_end, b_end) - max(a_start, b_start))
-
-
 def _detect_runtime() -> PipelineRuntime:
     warnings: list[str] = []
 
@@ -39,7 +42,7 @@ def _detect_runtime() -> PipelineRuntime:
             warnings.append("torch not available for device probing, defaulting ASR to CPU")
 
     if compute_type == "auto":
-        compute_type = "float16" if device == "cuda" else "int8"
+        compute_type = "int8_float16" if device == "cuda" else "int8"
 
     diarization_enabled = bool(os.getenv("HUGGINGFACE_TOKEN", "").strip())
     if not diarization_enabled:
@@ -53,53 +56,126 @@ def _detect_runtime() -> PipelineRuntime:
     )
 
 
-def _run_asr(audio_path: Path, runtime: PipelineRuntime) -> list[dict[str, Any]]:
+def _load_audio(audio_path: Path) -> Any:
+    # faster-whisper bundles its own PyAV decoder, so this works regardless of the system FFmpeg version.
+    from faster_whisper import decode_audio
+
+    return decode_audio(str(audio_path), sampling_rate=TARGET_SAMPLE_RATE)
+
+
+def _available_cpu_count() -> int:
+    # os.cpu_count() reports host cores; honour the container's CPU quota and affinity instead.
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text(encoding="utf-8").split()
+        if quota != "max":
+            return max(1, int(quota) // int(period))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _cpu_threads_per_worker() -> int:
+    # celery_app exports its resolved worker concurrency into the environment.
+    worker_concurrency = max(1, int(os.getenv("CELERY_WORKER_CONCURRENCY") or "1"))
+    return max(1, _available_cpu_count() // worker_concurrency)
+
+
+@functools.lru_cache(maxsize=2)
+def _get_whisper_model(model_size: str, device: str, compute_type: str) -> Any:
     from faster_whisper import WhisperModel
 
-    model_size = os.getenv("ASR_MODEL", "large-v3")
-    beam_size = int(os.getenv("ASR_BEAM_SIZE", "5"))
+    if device == "cpu":
+        return WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=_cpu_threads_per_worker())
+    return WhisperModel(model_size, device=device, compute_type=compute_type)
 
-    model = WhisperModel(model_size, device=runtime.asr_device, compute_type=runtime.asr_compute_type)
-    segments_iter, _ = model.transcribe(
-        str(audio_path),
-        beam_size=beam_size,
-        vad_filter=True,
-        word_timestamps=True,
-    )
+
+def _run_asr(
+    audio: Any,
+    runtime: PipelineRuntime,
+    on_segment: Callable[[dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    model_size = os.getenv("ASR_MODEL", DEFAULT_ASR_MODEL)
+    beam_size = int(os.getenv("ASR_BEAM_SIZE", "5"))
+    batch_size = int(os.getenv("ASR_BATCH_SIZE", "16"))
+    word_timestamps = os.getenv("ASR_WORD_TIMESTAMPS", "false").lower() in {"1", "true", "yes", "on"}
+
+    model = _get_whisper_model(model_size, runtime.asr_device, runtime.asr_compute_type)
+    if batch_size > 1:
+        from faster_whisper import BatchedInferencePipeline
+
+        segments_iter, _ = BatchedInferencePipeline(model=model).transcribe(
+            audio,
+            batch_size=batch_size,
+            chunk_length=30,
+            # Keep Whisper's timestamp tokens so segments stay utterance-sized instead of whole 30s chunks.
+            without_timestamps=False,
+            beam_size=beam_size,
+            vad_filter=True,
+            word_timestamps=word_timestamps,
+        )
+    else:
+        segments_iter, _ = model.transcribe(
+            audio,
+            beam_size=beam_size,
+            vad_filter=True,
+            word_timestamps=word_timestamps,
+        )
 
     asr_segments: list[dict[str, Any]] = []
     for idx, segment in enumerate(segments_iter, start=1):
-        asr_segments.append(
-            {
-                "segment_id": f"seg_{idx:04d}",
-                "start_sec": float(segment.start),
-                "end_sec": float(segment.end),
-                "text": segment.text.strip(),
-            }
-        )
+        asr_segment: dict[str, Any] = {
+            "segment_id": f"seg_{idx:04d}",
+            "start_sec": float(segment.start),
+            "end_sec": float(segment.end),
+            "text": segment.text.strip(),
+        }
+        if word_timestamps:
+            asr_segment["words"] = [
+                {"start_sec": float(word.start), "end_sec": float(word.end), "word": word.word}
+                for word in segment.words or []
+            ]
+        asr_segments.append(asr_segment)
+        if on_segment is not None:
+            on_segment(asr_segment)
     return asr_segments
 
 
-def _run_diarization(audio_path: Path, runtime: PipelineRuntime) -> list[dict[str, Any]]:
-    if not runtime.diarization_enabled:
-        return []
-
-    diarization_model = os.getenv("DIARIZATION_MODEL", "pyannote/speaker-diarization-3.1")
-    token = os.getenv("HUGGINGFACE_TOKEN", "")
-
+@functools.lru_cache(maxsize=1)
+def _get_diarization_pipeline(model_name: str, token: str, device: str) -> tuple[Any, str | None]:
     from pyannote.audio import Pipeline
 
-    pipeline = Pipeline.from_pretrained(diarization_model, use_auth_token=token)
+    pipeline = Pipeline.from_pretrained(model_name, use_auth_token=token)
+    pipeline.embedding_batch_size = 32
 
-    if runtime.asr_device == "cuda":
+    load_warning = None
+    if device == "cuda":
         try:
             import torch
 
             pipeline.to(torch.device("cuda"))
         except Exception:
-            runtime.warnings.append("Could not move diarization pipeline to CUDA; using CPU")
+            load_warning = "Could not move diarization pipeline to CUDA; using CPU"
+    return pipeline, load_warning
+
+
+def _run_diarization(audio: Any, runtime: PipelineRuntime) -> list[dict[str, Any]]:
+    if not runtime.diarization_enabled:
+        return []
+
+    diarization_model = os.getenv("DIARIZATION_MODEL", DEFAULT_DIARIZATION_MODEL)
+    token = os.getenv("HUGGINGFACE_TOKEN", "")
 
-    diarization = pipeline(str(audio_path))
+    import torch
+
+    pipeline, load_warning = _get_diarization_pipeline(diarization_model, token, runtime.asr_device)
+    if load_warning:
+        runtime.warnings.append(load_warning)
+
+    with torch.inference_mode():
+        diarization = pipeline({"waveform": torch.from_numpy(audio)[None], "sample_rate": TARGET_SAMPLE_RATE})
 
     diarization_segments: list[dict[str, Any]] = []
     for turn, _, speaker in diarization.itertracks(yield_label=True):
@@ -121,37 +197,76 @@ def _assign_speakers(
             segment["speaker_id"] = "UNKNOWN"
         return asr_segments
 
-    for segment in asr_segments:
-        start_sec = float(segment["start_sec"])
-        end_sec = float(segment["end_sec"])
-
-        best_speaker = "UNKNOWN"
-        best_overlap = 0.0
-
-        for diarization_segment in diarization_segments:
-            overlap = _overlap(
-                start_sec,
-                end_sec,
-                float(diarization_segment["start_sec"]),
-                float(diarization_segment["end_sec"]),
-            )
-            if overlap > best_overlap:
-                best_overlap = overlap
-                best_speaker = str(diarization_segment["speaker"])
-
-        segment["speaker_id"] = best_speaker
+    asr_starts = np.array([float(segment["start_sec"]) for segment in asr_segments])
+    asr_ends = np.array([float(segment["end_sec"]) for segment in asr_segments])
+    diar_starts = np.array([float(segment["start_sec"]) for segment in diarization_segments])
+    diar_ends = np.array([float(segment["end_sec"]) for segment in diarization_segments])
+    speakers = [str(segment["speaker"]) for segment in diarization_segments]
+
+    overlaps = np.minimum(asr_ends[:, None], diar_ends[None, :]) - np.maximum(
+        asr_starts[:, None], diar_starts[None, :]
+    )
+    best_indices = overlaps.argmax(axis=1)
+    best_overlaps = overlaps.max(axis=1)
+
+    for segment, best_index, best_overlap in zip(asr_segments, best_indices, best_overlaps):
+        segment["speaker_id"] = speakers[best_index] if best_overlap > 0 else "UNKNOWN"
     return asr_segments
 
 
-def transcribe_and_diarize(audio_path: Path) -> dict[str, Any]:
+def _whisper_model_cached(model_size: str) -> bool:
+    if os.path.isdir(model_size):
+        return True
+    from faster_whisper.utils import download_model
+
+    try:
+        download_model(model_size, local_files_only=True)
+    except Exception:
+        return False
+    return True
+
+
+def _diarization_pipeline_cached(model_name: str) -> bool:
+    if os.path.exists(model_name):
+        return True
+    from huggingface_hub import try_to_load_from_cache
+
+    return isinstance(try_to_load_from_cache(model_name, "config.yaml"), str)
+
+
+def warm_up_models() -> list[str]:
+    # Downloads are left to the first job: a long first-boot download during warmup would
+    # outlast worker_proc_alive_timeout and get the process killed and respawned repeatedly.
+    skipped: list[str] = []
+    runtime = _detect_runtime()
+
+    model_size = os.getenv("ASR_MODEL", DEFAULT_ASR_MODEL)
+    if _whisper_model_cached(model_size):
+        _get_whisper_model(model_size, runtime.asr_device, runtime.asr_compute_type)
+    else:
+        skipped.append(f"Whisper model {model_size} is not cached locally")
+
+    if runtime.diarization_enabled:
+        diarization_model = os.getenv("DIARIZATION_MODEL", DEFAULT_DIARIZATION_MODEL)
+        if _diarization_pipeline_cached(diarization_model):
+            _get_diarization_pipeline(diarization_model, os.getenv("HUGGINGFACE_TOKEN", ""), runtime.asr_device)
+        else:
+            skipped.append(f"Diarization pipeline {diarization_model} is not cached locally")
+    return skipped
+
+
+def transcribe_and_diarize(
+    audio_path: Path, on_segment: Callable[[dict[str, Any]], None] | None = None
+) -> dict[str, Any]:
     runtime = _detect_runtime()
+    audio = _load_audio(audio_path)
 
-    asr_segments = _run_asr(audio_path, runtime)
+    asr_segments = _run_asr(audio, runtime, on_segment)
 
     diarization_segments: list[dict[str, Any]] = []
     if runtime.diarization_enabled:
         try:
-            diarization_segments = _run_diarization(audio_path, runtime)
+            diarization_segments = _run_diarization(audio, runtime)
         except Exception as diarization_error:  # pragma: no cover - runtime/hardware dependent
             runtime.warnings.append(f"Diarization failed and was skipped: {diarization_error}")
 
@@ -163,8 +278,8 @@ def transcribe_and_diarize(audio_path: Path) -> dict[str, Any]:
         "metadata": {
             "asr_device": runtime.asr_device,
             "asr_compute_type": runtime.asr_compute_type,
-            "asr_model": os.getenv("ASR_MODEL", "large-v3"),
-            "diarization_model": os.getenv("DIARIZATION_MODEL", "pyannote/speaker-diarization-3.1"),
+            "asr_model": os.getenv("ASR_MODEL", DEFAULT_ASR_MODEL),
+            "diarization_model": os.getenv("DIARIZATION_MODEL", DEFAULT_DIARIZATION_MODEL),
             "diarization_enabled": runtime.diarization_enabled,
             "warnings": runtime.warnings,
         },
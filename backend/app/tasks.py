@@ -1,29 +1,53 @@
 from __future__ import annotations
 
-import json
+import itertools
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Any
 
+import orjson
+
 from .celery_app import celery_app
 from .speech_pipeline import transcribe_and_diarize
 from .todo_extractor import extract_todos_with_ollama
 
 celery = celery_app
 
+TRIGGER_PHRASES = ("i will", "i'll", "we need", "todo", "can you", "please", "action item")
+TRIGGER_RE = re.compile("|".join(re.escape(phrase) for phrase in TRIGGER_PHRASES), re.IGNORECASE)
+
+# Artifact files are independent, so their writes (and fsyncs on network storage) can overlap.
+_ARTIFACT_WRITER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="artifact-writer")
+
 
 def _job_dir(job_id: str) -> Path:
     root = Path(os.getenv("DATA_ROOT", "/data"))
     return root / "jobs" / job_id
 
 
-def _write_json(path: Path, payload: dict[str, Any]) -> None:
+def _write_json(path: Path, payload: dict[str, Any], compact: bool = False) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    path.write_bytes(orjson.dumps(payload) if compact else orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+
+
+def _read_uploaded_filename(job_dir: Path) -> str | None:
+    try:
+        status = orjson.loads((job_dir / "status.json").read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    uploaded_file = status.get("uploaded_file") if isinstance(status, dict) else None
+    return str(uploaded_file) if uploaded_file else None
+
 
+def _find_uploaded_audio(job_dir: Path, uploaded_file: str | None = None) -> Path:
+    if uploaded_file:
+        uploaded_path = job_dir / uploaded_file
+        if uploaded_path.is_file():
+            return uploaded_path
 
-def _find_uploaded_audio(job_dir: Path) -> Path:
     allowed_suffixes = {".mp3", ".wav", ".m4a", ".flac", ".aac", ".ogg", ".mp4", ".webm"}
     candidates: list[Path] = []
 
@@ -42,18 +66,25 @@ def _find_uploaded_audio(job_dir: Path) -> Path:
     return candidates[0]
 
 
-def _extract_todos(transcript_segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    trigger_phrases = ("i will", "i'll", "we need", "todo", "can you", "please", "action item")
-    todos: list[dict[str, Any]] = []
+def _is_todo_candidate(segment: dict[str, Any]) -> bool:
+    # Every trigger phrase has non-whitespace characters, so blank text can never match.
+    return TRIGGER_RE.search(str(segment.get("text", ""))) is not None
 
-    for index, segment in enumerate(transcript_segments, start=1):
-        text = str(segment.get("text", "")).strip()
-        if not text:
-            continue
-        lowered = text.lower()
-        if not any(trigger in lowered for trigger in trigger_phrases):
-            continue
 
+def _extract_todos(
+    transcript_segments: list[dict[str, Any]],
+    candidates: list[tuple[int, dict[str, Any]]] | None = None,
+) -> list[dict[str, Any]]:
+    if candidates is None:
+        candidates = [
+            (index, segment)
+            for index, segment in enumerate(transcript_segments, start=1)
+            if _is_todo_candidate(segment)
+        ]
+
+    todos: list[dict[str, Any]] = []
+    for index, segment in candidates:
+        text = str(segment.get("text", "")).strip()
         todos.append(
             {
                 "todo_id": f"todo_{index:04d}",
@@ -107,42 +138,66 @@ def _group_todos_by_owner(todos: list[dict[str, Any]]) -> str:
 def run_pipeline(job_id: str) -> dict[str, Any]:
     job_dir = _job_dir(job_id)
     artifacts_dir = job_dir / "artifacts"
+    uploaded_file = _read_uploaded_filename(job_dir)
     _write_json(
         job_dir / "status.json",
-        {"job_id": job_id, "status": "processing", "updated_at": datetime.now(timezone.utc).isoformat()},
+        {
+            "job_id": job_id,
+            "status": "processing",
+            "uploaded_file": uploaded_file,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        },
     )
 
     try:
-        audio_path = _find_uploaded_audio(job_dir)
-        transcript = transcribe_and_diarize(audio_path)
+        audio_path = _find_uploaded_audio(job_dir, uploaded_file)
+
+        # Speaker ids are filled in on these same dicts once diarization finishes.
+        todo_candidates: list[tuple[int, dict[str, Any]]] = []
+        segment_positions = itertools.count(1)
+
+        def _collect_todo_candidate(segment: dict[str, Any]) -> None:
+            index = next(segment_positions)
+            if _is_todo_candidate(segment):
+                todo_candidates.append((index, segment))
+
+        transcript = transcribe_and_diarize(audio_path, on_segment=_collect_todo_candidate)
         transcript_segments = transcript.get("segments", [])
         extraction_mode = "heuristic"
         extraction_warnings: list[str] = []
 
         if os.getenv("TODO_USE_OLLAMA", "true").lower() in {"1", "true", "yes", "on"}:
             try:
-                llm_todos = extract_todos_with_ollama(transcript_segments)
+                llm_todos = extract_todos_with_ollama(transcript_segments, extraction_warnings)
                 if llm_todos:
                     todos_payload = {"todos": llm_todos}
                     extraction_mode = "ollama"
                 else:
-                    todos_payload = {"todos": _extract_todos(transcript_segments)}
+                    todos_payload = {"todos": _extract_todos(transcript_segments, todo_candidates)}
                     extraction_warnings.append("Ollama extraction returned no todos; used heuristic fallback")
             except Exception as extraction_error:
-                todos_payload = {"todos": _extract_todos(transcript_segments)}
+                todos_payload = {"todos": _extract_todos(transcript_segments, todo_candidates)}
                 extraction_warnings.append(f"Ollama extraction failed; used heuristic fallback: {extraction_error}")
         else:
-            todos_payload = {"todos": _extract_todos(transcript_segments)}
+            todos_payload = {"todos": _extract_todos(transcript_segments, todo_candidates)}
 
         grouped_output = _group_todos_by_owner(todos_payload["todos"])
 
-        _write_json(artifacts_dir / "transcript.json", transcript)
-        _write_json(artifacts_dir / "todos.json", todos_payload)
-        (artifacts_dir / "todos_by_person.txt").write_text(grouped_output, encoding="utf-8")
+        artifacts_dir.mkdir(parents=True, exist_ok=True)
+        artifact_writes = [
+            _ARTIFACT_WRITER.submit(_write_json, artifacts_dir / "transcript.json", transcript, compact=True),
+            _ARTIFACT_WRITER.submit(_write_json, artifacts_dir / "todos.json", todos_payload, compact=True),
+            _ARTIFACT_WRITER.submit(
+                (artifacts_dir / "todos_by_person.txt").write_text, grouped_output, encoding="utf-8"
+            ),
+        ]
+        for artifact_write in artifact_writes:
+            artifact_write.result()
 
         status: dict[str, Any] = {
             "job_id": job_id,
             "status": "completed",
+            "uploaded_file": uploaded_file,
             "updated_at": datetime.now(timezone.utc).isoformat(),
             "artifacts": {
                 "transcript": str((artifacts_dir / "transcript.json").name),
@@ -161,6 +216,7 @@ def run_pipeline(job_id: str) -> dict[str, Any]:
         failed_status = {
             "job_id": job_id,
             "status": "failed",
+            "uploaded_file": uploaded_file,
             "updated_at": datetime.now(timezone.utc).isoformat(),
             "error": str(pipeline_error),
         }
@@ -1,11 +1,35 @@
 from __future__ import annotations
 
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import cast
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def _build_session() -> requests.Session:
+    # Only connection failures are retried; a read failure on a chat POST is not replayed.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, connect=3, read=0, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+OLLAMA_NUM_PREDICT = 1024
+# Headroom for the system message and extraction instructions around each transcript chunk.
+PROMPT_OVERHEAD_TOKENS = 1024
+
+# Shared by the chunk threads so Ollama calls reuse keep-alive connections.
+_SESSION = _build_session()
 
 
 def _extract_json_object(raw_text: str) -> dict[str, Any]:
@@ -14,19 +38,9 @@ def _extract_json_object(raw_text: str) -> dict[str, Any]:
         raise ValueError("LLM returned empty output")
 
     try:
-        parsed = json.loads(raw_text)
-        if isinstance(parsed, dict):
-            return cast(dict[str, Any], parsed)
-    except json.JSONDecodeError:
-        pass
-
-    start = raw_text.find("{")
-    end = raw_text.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError("No JSON object found in LLM output")
-
-    candidate = raw_text[start : end + 1]
-    parsed = json.loads(candidate)
+        parsed = orjson.loads(raw_text)
+    except orjson.JSONDecodeError as decode_error:
+        raise ValueError(f"LLM output is not valid JSON: {decode_error}") from decode_error
     if not isinstance(parsed, dict):
         raise ValueError("LLM output JSON root must be an object")
     return cast(dict[str, Any], parsed)
@@ -44,7 +58,7 @@ def _build_prompt(transcript_segments: list[dict[str, Any]]) -> str:
         for segment in transcript_segments
     ]
 
-    transcript_json = json.dumps({"segments": compact_segments}, ensure_ascii=False)
+    transcript_json = orjson.dumps({"segments": compact_segments}).decode("utf-8")
 
     return (
         "You are an assistant that extracts action items from meeting transcripts. "
@@ -112,27 +126,68 @@ def _normalize_todos(payload: dict[str, Any], valid_speakers: set[str]) -> list[
     return normalized
 
 
-def extract_todos_with_ollama(transcript_segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    if not transcript_segments:
-        return []
+def _estimate_tokens(segment: dict[str, Any]) -> int:
+    # ~4 characters per token, plus the per-segment JSON keys and ids.
+    return len(str(segment.get("text", ""))) // 4 + 24
+
+
+def _chunk_segments(
+    transcript_segments: list[dict[str, Any]], max_tokens: int = 1500, overlap: int = 2
+) -> list[list[dict[str, Any]]]:
+    chunks: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    current_tokens = 0
+
+    for segment in transcript_segments:
+        segment_tokens = _estimate_tokens(segment)
+        if current and current_tokens + segment_tokens > max_tokens:
+            chunks.append(current)
+            carried = current[-overlap:] if overlap > 0 else []
+            carried_tokens = sum(_estimate_tokens(carried_segment) for carried_segment in carried)
+            # Only carry context that still leaves room for the next segment within the budget.
+            if carried_tokens + segment_tokens <= max_tokens:
+                current, current_tokens = carried, carried_tokens
+            else:
+                current, current_tokens = [], 0
+        current.append(segment)
+        current_tokens += segment_tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _chunk_token_budget() -> int:
+    return int(os.getenv("OLLAMA_CHUNK_TOKENS", "1500"))
+
+
+def _context_window() -> int:
+    # Ollama reserves num_ctx of KV cache per parallel slot, so size it to one chunk, rounded up to 1k.
+    needed = _chunk_token_budget() + PROMPT_OVERHEAD_TOKENS + OLLAMA_NUM_PREDICT
+    return -(-needed // 1024) * 1024
 
+
+def _call_ollama(chunk_segments: list[dict[str, Any]]) -> dict[str, Any]:
     base_url = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434").rstrip("/")
     model = os.getenv("OLLAMA_MODEL", "qwen2.5:14b")
     timeout_sec = int(os.getenv("OLLAMA_TIMEOUT_SEC", "180"))
 
-    prompt = _build_prompt(transcript_segments)
+    prompt = _build_prompt(chunk_segments)
 
-    response = requests.post(
+    response = _SESSION.post(
         f"{base_url}/api/chat",
         json={
             "model": model,
             "stream": False,
+            "format": "json",
             "messages": [
                 {"role": "system", "content": "You extract actionable tasks and owner assignments from transcript segments."},
                 {"role": "user", "content": prompt},
             ],
             "options": {
                 "temperature": 0.1,
+                "num_ctx": _context_window(),
+                "num_predict": OLLAMA_NUM_PREDICT,
             },
         },
         timeout=timeout_sec,
@@ -143,8 +198,57 @@ def extract_todos_with_ollama(transcript_segments: list[dict[str, Any]]) -> list
     message = payload.get("message", {})
     content = message.get("content", "")
 
-    llm_json = _extract_json_object(str(content))
+    return _extract_json_object(str(content))
+
+
+def _merge_todos(todo_lists: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    merged: list[dict[str, Any]] = []
+    seen: set[tuple[str, str]] = set()
+
+    for todos in todo_lists:
+        for todo in todos:
+            key = (todo["owner"], todo["text"][:60].lower())
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(todo)
+
+    # Each chunk numbers its todos independently, so reassign ids after merging.
+    for idx, todo in enumerate(merged, start=1):
+        todo["todo_id"] = f"todo_{idx:04d}"
+    return merged
+
+
+def _extract_chunk_todos(
+    chunk_segments: list[dict[str, Any]], valid_speakers: set[str]
+) -> list[dict[str, Any]] | Exception:
+    try:
+        return _normalize_todos(_call_ollama(chunk_segments), valid_speakers)
+    except (requests.RequestException, ValueError) as chunk_error:
+        return chunk_error
+
+
+def extract_todos_with_ollama(
+    transcript_segments: list[dict[str, Any]], warnings: list[str] | None = None
+) -> list[dict[str, Any]]:
+    if not transcript_segments:
+        return []
+
+    chunk_tokens = _chunk_token_budget()
+    max_workers = int(os.getenv("OLLAMA_MAX_PARALLEL", "4"))
+
     valid_speakers = {str(segment.get("speaker_id", "UNKNOWN")) for segment in transcript_segments}
     valid_speakers.add("UNKNOWN")
 
-    return _normalize_todos(llm_json, valid_speakers)
+    chunks = _chunk_segments(transcript_segments, max_tokens=chunk_tokens)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        chunk_results = list(pool.map(lambda chunk: _extract_chunk_todos(chunk, valid_speakers), chunks))
+
+    # A failed chunk only loses its own todos; give up only when no chunk succeeded.
+    failures = [result for result in chunk_results if isinstance(result, Exception)]
+    if len(failures) == len(chunk_results):
+        raise failures[0]
+    if failures and warnings is not None:
+        warnings.append(f"Ollama extraction failed for {len(failures)} of {len(chunks)} transcript chunks: {failures[0]}")
+
+    return _merge_todos([result for result in chunk_results if not isinstance(result, Exception)])
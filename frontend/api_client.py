@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_session() -> requests.Session:
+    # Only connection failures are retried; a read failure on an upload POST is not replayed.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, connect=3, read=0, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def iter_status_events(response: requests.Response) -> Iterator[dict[str, Any]]:
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        payload = json.loads(line[len("data:") :].strip())
+        yield payload if isinstance(payload, dict) else {}
@@ -8,7 +8,13 @@ from typing import Any
 import gradio as gr
 import requests
 
+from api_client import build_session, iter_status_events
+
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+JOB_WAIT_TIMEOUT_SEC = 120
+
+
+_SESSION = build_session()
 
 
 def _format_api_error(prefix: str, response: requests.Response) -> str:
@@ -61,7 +67,7 @@ def process_audio(audio_file: str):
     try:
         upload_url = f"{API_BASE_URL}/jobs/upload"
         with open(audio_file, "rb") as audio_stream:
-            response = requests.post(upload_url, files={"file": (Path(audio_file).name, audio_stream)}, timeout=60)
+            response = _SESSION.post(upload_url, files={"file": (Path(audio_file).name, audio_stream)}, timeout=60)
 
         if response.status_code >= 400:
             return _format_api_error("Upload failed.", response), "", None
@@ -71,19 +77,19 @@ def process_audio(audio_file: str):
 
         status_text = "queued"
         status_payload: dict[str, Any] = {}
-        for _ in range(60):
-            status_response = requests.get(f"{API_BASE_URL}/jobs/{job_id}", timeout=30)
-            if status_response.status_code >= 400:
-                return _format_api_error(f"Status check failed for job {job_id}.", status_response), "", None
-
-            payload = status_response.json()
-            status_payload = payload if isinstance(payload, dict) else {}
-            status_text = str(status_payload.get("status", "unknown"))
-            if status_text == "completed":
-                break
-            if status_text == "failed":
-                return _format_failed_job_message(job_id, status_payload), "", None
-            time.sleep(2)
+        deadline = time.monotonic() + JOB_WAIT_TIMEOUT_SEC
+        with _SESSION.get(f"{API_BASE_URL}/jobs/{job_id}/events", stream=True, timeout=(10, 60)) as events_response:
+            if events_response.status_code >= 400:
+                return _format_api_error(f"Status check failed for job {job_id}.", events_response), "", None
+
+            for status_payload in iter_status_events(events_response):
+                status_text = str(status_payload.get("status", "unknown"))
+                if status_text == "completed":
+                    break
+                if status_text == "failed":
+                    return _format_failed_job_message(job_id, status_payload), "", None
+                if time.monotonic() >= deadline:
+                    break
 
         if status_text != "completed":
             return (
@@ -91,7 +97,7 @@ def process_audio(audio_file: str):
                 "Try again in a minute and check backend logs for long-running model initialization."
             ), "", None
 
-        result_response = requests.get(f"{API_BASE_URL}/jobs/{job_id}/result", timeout=30)
+        result_response = _SESSION.get(f"{API_BASE_URL}/jobs/{job_id}/result", timeout=30)
         if result_response.status_code >= 400:
             return _format_api_error(f"Result retrieval failed for job {job_id}.", result_response), "", None
 
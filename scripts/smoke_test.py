@@ -7,8 +7,18 @@ from pathlib import Path
 
 import requests
 
+# Share the frontend's API client helpers instead of keeping a copy here.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "frontend"))
 
-def run_smoke_test(api_base_url: str, audio_file: Path, poll_interval_sec: float, timeout_sec: int) -> int:
+from api_client import build_session, iter_status_events  # noqa: E402
+
+
+def run_smoke_test(api_base_url: str, audio_file: Path, timeout_sec: int) -> int:
+    with build_session() as session:
+        return _run_smoke_test(session, api_base_url, audio_file, timeout_sec)
+
+
+def _run_smoke_test(session: requests.Session, api_base_url: str, audio_file: Path, timeout_sec: int) -> int:
     if not audio_file.exists() or not audio_file.is_file():
         print(f"Audio file not found: {audio_file}")
         return 2
@@ -17,7 +27,7 @@ def run_smoke_test(api_base_url: str, audio_file: Path, poll_interval_sec: float
     upload_url = f"{api_base_url.rstrip('/')}/jobs/upload"
 
     with audio_file.open("rb") as stream:
-        upload_response = requests.post(
+        upload_response = session.post(
             upload_url,
             files={"file": (audio_file.name, stream, "audio/wav")},
             timeout=120,
@@ -35,33 +45,38 @@ def run_smoke_test(api_base_url: str, audio_file: Path, poll_interval_sec: float
 
     print(f"Job queued: {job_id}")
 
-    status_url = f"{api_base_url.rstrip('/')}/jobs/{job_id}"
+    events_url = f"{api_base_url.rstrip('/')}/jobs/{job_id}/events"
     deadline = time.time() + timeout_sec
+    last_status = None
+    completed = False
 
-    while time.time() < deadline:
-        status_response = requests.get(status_url, timeout=60)
-        if status_response.status_code >= 400:
-            print(f"Status check failed [{status_response.status_code}]: {status_response.text}")
+    with session.get(events_url, stream=True, timeout=(10, 60)) as events_response:
+        if events_response.status_code >= 400:
+            print(f"Status check failed [{events_response.status_code}]: {events_response.text}")
             return 5
 
-        status_payload = status_response.json()
-        status = str(status_payload.get("status", "unknown"))
-        print(f"Status: {status}")
-
-        if status == "completed":
-            break
-        if status == "failed":
-            print("Job failed:")
-            print(status_payload)
-            return 6
-
-        time.sleep(poll_interval_sec)
-    else:
+        for status_payload in iter_status_events(events_response):
+            status = str(status_payload.get("status", "unknown"))
+            if status != last_status:
+                print(f"Status: {status}")
+                last_status = status
+
+            if status == "completed":
+                completed = True
+                break
+            if status == "failed":
+                print("Job failed:")
+                print(status_payload)
+                return 6
+            if time.time() >= deadline:
+                break
+
+    if not completed:
         print(f"Timed out after {timeout_sec}s waiting for completion")
         return 7
 
     result_url = f"{api_base_url.rstrip('/')}/jobs/{job_id}/result"
-    result_response = requests.get(result_url, timeout=60)
+    result_response = session.get(result_url, timeout=60)
     if result_response.status_code >= 400:
         print(f"Result fetch failed [{result_response.status_code}]: {result_response.text}")
         return 8
@@ -86,7 +101,6 @@ def parse_args() -> argparse.Namespace:
         default="test-data/sample-multi-speaker.wav",
         help="Path to input audio file",
     )
-    parser.add_argument("--poll-interval", type=float, default=3.0, help="Seconds between status polls")
     parser.add_argument("--timeout", type=int, default=900, help="Total timeout in seconds")
     return parser.parse_args()
 
@@ -96,7 +110,6 @@ if __name__ == "__main__":
     exit_code = run_smoke_test(
         api_base_url=args.api,
         audio_file=Path(args.audio),
-        poll_interval_sec=args.poll_interval,
         timeout_sec=args.timeout,
     )
     sys.exit(exit_code)